@@ -1,24 +1,116 @@
 import aiosqlite
+import asyncio
+import secrets
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Optional
 
 DATABASE_PATH = Path(__file__).parent.parent / "data" / "recipes.db"
 
+# Bump when init_db gains a new migration or seed step (stored in PRAGMA user_version)
+SCHEMA_VERSION = 2
 
-async def get_db():
-    """Get database connection."""
+# Per-connection tuning; journal_mode=WAL also persists in the database file
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+]
+
+
+async def configure_connection(db: aiosqlite.Connection):
+    """Apply WAL mode and sync/cache PRAGMAs to a new connection."""
+    for pragma in CONNECTION_PRAGMAS:
+        await db.execute(pragma)
+
+
+# Process-wide connections shared by all requests (opened lazily, closed on shutdown).
+# Handlers read through _connection and write through transaction() on
+# _write_connection, so a read never sees another request's uncommitted rows.
+_connection: Optional[aiosqlite.Connection] = None
+_write_connection: Optional[aiosqlite.Connection] = None
+
+
+async def open_connection() -> aiosqlite.Connection:
+    """Open and configure a new database connection."""
     DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
     db = await aiosqlite.connect(DATABASE_PATH)
     db.row_factory = aiosqlite.Row
-    try:
-        yield db
-    finally:
-        await db.close()
+    await configure_connection(db)
+    return db
+
+
+async def get_connection() -> aiosqlite.Connection:
+    """Return the shared read connection, opening it on first use."""
+    global _connection
+    if _connection is None:
+        _connection = await open_connection()
+    return _connection
+
+
+async def close_db():
+    """Close the shared database connections."""
+    global _connection, _write_connection
+    for db in (_connection, _write_connection):
+        if db is not None:
+            await db.close()
+    _connection = None
+    _write_connection = None
+
+
+# Serializes write transactions on the shared write connection
+_write_lock = asyncio.Lock()
+
+# Bumped whenever a transaction() ends, committed or rolled back, so pages and
+# caches built from database reads can tell that the data may have changed;
+# the per-process prefix stops ETags handed out by a previous run from matching
+_DATA_VERSION_PREFIX = secrets.token_hex(4)
+_data_version = 0
+
+
+def data_version() -> int:
+    """Return the current data version."""
+    return _data_version
+
+
+def data_etag() -> str:
+    """Weak ETag (the body may be gzipped or not) for pages rendered purely from database contents."""
+    return f'W/"{_DATA_VERSION_PREFIX}-{_data_version}"'
+
+
+@asynccontextmanager
+async def transaction():
+    """Run a block of writes as a single BEGIN IMMEDIATE ... COMMIT on the write connection."""
+    global _write_connection, _data_version
+    async with _write_lock:
+        if _write_connection is None:
+            _write_connection = await open_connection()
+        db = _write_connection
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+            await db.commit()
+        except BaseException:
+            # Also covers a failed COMMIT, which would otherwise leave the
+            # shared write connection stuck inside the transaction
+            await db.rollback()
+            raise
+        finally:
+            _data_version += 1
+
+
+async def get_db():
+    """Get the shared read connection; writes go through transaction()."""
+    yield await get_connection()
 
 
 async def init_db():
     """Initialize database tables."""
     DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
     async with aiosqlite.connect(DATABASE_PATH) as db:
+        await configure_connection(db)
         await db.executescript("""
             CREATE TABLE IF NOT EXISTS recipes (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -64,11 +156,25 @@ async def init_db():
                 base_unit TEXT NOT NULL
             );
 
-            CREATE INDEX IF NOT EXISTS idx_ingredients_recipe ON ingredients(recipe_id);
+            -- Covers ordered per-recipe ingredient reads without touching the table;
+            -- supersedes the older recipe_id and (recipe_id, sort_order) indexes
+            DROP INDEX IF EXISTS idx_ingredients_recipe;
+            DROP INDEX IF EXISTS idx_ingredients_recipe_sort;
+            CREATE INDEX IF NOT EXISTS idx_ingredients_recipe_covering
+                ON ingredients(recipe_id, sort_order, name, quantity, unit);
+            CREATE INDEX IF NOT EXISTS idx_recipes_name ON recipes(name);
             CREATE INDEX IF NOT EXISTS idx_shopping_selections_recipe ON shopping_selections(recipe_id);
+            CREATE INDEX IF NOT EXISTS idx_unit_conversions_lookup ON unit_conversions(from_unit, to_unit, ingredient_category);
+            CREATE INDEX IF NOT EXISTS idx_shopping_units_pattern ON shopping_units(ingredient_pattern);
         """)
         await db.commit()
 
+        # Migrations and seeding only need to run once per database file
+        cursor = await db.execute("PRAGMA user_version")
+        version = (await cursor.fetchone())[0]
+        if version >= SCHEMA_VERSION:
+            return
+
         # Migration: add complexity column if it doesn't exist
         try:
             await db.execute("ALTER TABLE recipes ADD COLUMN complexity TEXT DEFAULT 'medium'")
@@ -83,15 +189,25 @@ async def init_db():
         except Exception:
             pass  # Column already exists
 
+        # Favorites list, read in name order (needs the favorite column above)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_recipes_favorite_name ON recipes(name) WHERE favorite = 1"
+        )
+        await db.commit()
+
         # Seed default unit conversions if empty
         cursor = await db.execute("SELECT COUNT(*) FROM unit_conversions")
         count = (await cursor.fetchone())[0]
         if count == 0:
             await seed_unit_conversions(db)
 
+        await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
 
 async def seed_unit_conversions(db):
-    """Seed default unit conversions."""
+    """Seed default unit conversions and shopping units in one transaction."""
+    await db.execute("BEGIN")
+
     conversions = [
         # Volume conversions (to teaspoons as base)
         ("tbsp", "tsp", 3, None),
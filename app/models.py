@@ -1,9 +1,26 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, List
-
-
-@dataclass
+import re
+
+# Splits instructions into steps on newlines or sentence boundaries
+STEP_SPLIT_RE = re.compile(r'(?:\r?\n)+|(?<=\.)\s+(?=[A-Z0-9])')
+
+# Common fractions keyed by numerator over 24 (covers eighths and thirds)
+COMMON_FRACTIONS = {
+    3: "1/8",
+    6: "1/4",
+    8: "1/3",
+    9: "3/8",
+    12: "1/2",
+    15: "5/8",
+    16: "2/3",
+    18: "3/4",
+    21: "7/8",
+}
+
+
+@dataclass(slots=True)
 class Ingredient:
     id: Optional[int]
     recipe_id: int
@@ -15,17 +32,18 @@ class Ingredient:
     @property
     def display(self) -> str:
         """Format ingredient for display."""
-        parts = []
-        if self.quantity:
-            # Format quantity nicely (1.0 -> 1, 0.5 -> 1/2, etc.)
-            parts.append(format_quantity(self.quantity))
+        # Format quantity nicely (1.0 -> 1, 0.5 -> 1/2, etc.)
+        qty = format_quantity(self.quantity) if self.quantity else ""
+        if qty and self.unit:
+            return f"{qty} {self.unit} {self.name}"
+        if qty:
+            return f"{qty} {self.name}"
         if self.unit:
-            parts.append(self.unit)
-        parts.append(self.name)
-        return " ".join(parts)
+            return f"{self.unit} {self.name}"
+        return self.name
 
 
-@dataclass
+@dataclass(slots=True)
 class Recipe:
     id: Optional[int]
     name: str
@@ -33,6 +51,7 @@ class Recipe:
     instructions: Optional[str] = None
     source_url: Optional[str] = None
     complexity: Optional[str] = None
+    favorite: bool = False
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     ingredients: List[Ingredient] = None
@@ -51,11 +70,9 @@ def calculate_complexity(num_ingredients: int, instructions: str) -> str:
     - Medium: combined score 17-29
     - Hard: combined score ≥30 (roughly top 25%)
     """
-    import re
-
     # Count steps by splitting on newlines or sentence boundaries
     if instructions:
-        steps = re.split(r'(?:\r?\n)+|(?<=\.)\s+(?=[A-Z0-9])', instructions)
+        steps = STEP_SPLIT_RE.split(instructions)
         steps = [s.strip() for s in steps if s.strip() and len(s.strip()) > 10]
         num_steps = len(steps)
     else:
@@ -71,7 +88,7 @@ def calculate_complexity(num_ingredients: int, instructions: str) -> str:
         return "medium"
 
 
-@dataclass
+@dataclass(slots=True)
 class ShoppingItem:
     """Aggregated ingredient for shopping list."""
     name: str
@@ -88,28 +105,14 @@ def format_quantity(qty: float) -> str:
     if qty is None:
         return ""
 
-    # Common fractions
-    fractions = {
-        0.125: "1/8",
-        0.25: "1/4",
-        0.333: "1/3",
-        0.375: "3/8",
-        0.5: "1/2",
-        0.625: "5/8",
-        0.666: "2/3",
-        0.75: "3/4",
-        0.875: "7/8",
-    }
-
     whole = int(qty)
     frac = qty - whole
 
-    # Check if fraction part matches a common fraction
-    frac_str = ""
-    for value, display in fractions.items():
-        if abs(frac - value) < 0.01:
-            frac_str = display
-            break
+    # Check if fraction part matches a common fraction (nearest 24th)
+    key = round(frac * 24)
+    frac_str = COMMON_FRACTIONS.get(key, "")
+    if frac_str and abs(frac - key / 24) >= 0.01:
+        frac_str = ""
 
     if whole == 0 and frac_str:
         return frac_str
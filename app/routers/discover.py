@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Request, Depends, Form
+from fastapi import APIRouter, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-import aiosqlite
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import json
-import re
 from typing import Optional, List, Dict
+from collections import OrderedDict
+from itertools import chain, zip_longest
 import asyncio
+import functools
+import random
+import time
 
-from ..database import get_db
-from ..models import calculate_complexity
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json works the same here
+    json_loads = json.loads
+
+from ..templating import templates
+from ..database import transaction
+from ..models import calculate_complexity, STEP_SPLIT_RE
 
 router = APIRouter(prefix="/discover", tags=["discover"])
-templates = Jinja2Templates(directory="app/templates")
 
 # API endpoints
 MEALDB_BASE = "https://www.themealdb.com/api/json/v1/1"
@@ -21,39 +29,233 @@ BBC_BASE = "https://www.bbcgoodfood.com"
 SKINNYTASTE_BASE = "https://www.skinnytaste.com"
 HEYGRILLHEY_BASE = "https://heygrillhey.com"
 
+# MealDB spreads ingredients over 20 numbered fields
+MEALDB_INGREDIENT_KEYS = tuple(f"strIngredient{i}" for i in range(1, 21))
+MEALDB_MEASURE_KEYS = tuple(f"strMeasure{i}" for i in range(1, 21))
+
 HTTP_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 }
 
 COMPLEXITY_ORDER = {"easy": 1, "medium": 2, "hard": 3}
 
+# Browser caching for discover responses (everything else is served no-store)
+DISCOVER_HOME_CACHE_CONTROL = "public, max-age=300"
+DISCOVER_RESULT_CACHE_CONTROL = "public, max-age=1800, stale-while-revalidate=3600"
+
+# Cuisines left out of discovery results (per user preference)
+EXCLUDED_AREAS = frozenset({"Indian"})
+
+# Over-fetch random picks so excluded and too-complex meals still leave a full page
+RANDOM_FETCH_COUNT = 20
+
+# Complexity indexed by combined score (ingredients + steps), clamped at HARD_SCORE
+HARD_SCORE = 30
+COMPLEXITY_BY_SCORE = ("easy",) * 17 + ("medium",) * 13 + ("hard",)
+
+# Fail fast on connect/pool waits but give slow recipe pages time to download
+HTTP_TIMEOUT = httpx.Timeout(connect=3.0, read=10.0, write=5.0, pool=5.0)
+
+# Shared client so connections to each source stay open between requests
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Throttled (429) and failing (5xx) upstream responses are retried with jittered backoff
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 5.0
+
+# Hold off a host once it reports fewer requests left than this
+RATE_LIMIT_LOW_WATER = 3
+
+# Host -> monotonic time until which requests to it wait
+_host_paused_until: Dict[str, float] = {}
+
+# Most requests in flight to any one host, across all users
+MAX_REQUESTS_PER_HOST = 8
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def retry_after_seconds(response: httpx.Response, default: float) -> float:
+    """Read a Retry-After header in seconds, capped at RETRY_MAX_DELAY."""
+    try:
+        seconds = float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        seconds = default
+    return min(max(seconds, 0.0), RETRY_MAX_DELAY)
+
+
+def pause_host(host: str, seconds: float):
+    """Make requests to host wait for the next `seconds`."""
+    until = time.monotonic() + seconds
+    if until > _host_paused_until.get(host, 0.0):
+        _host_paused_until[host] = until
+
+
+async def get_with_retry(client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+    """
+    GET url, retrying 429 and 5xx responses with exponential backoff.
+
+    A 429 pauses every request to that host for the backoff (or Retry-After)
+    period, as does a response whose X-RateLimit-Remaining runs low. After
+    RETRY_ATTEMPTS retries the last response is returned as-is. At most
+    MAX_REQUESTS_PER_HOST requests to a host are in flight at once.
+    """
+    host = httpx.URL(url).host
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = _host_semaphores[host] = asyncio.Semaphore(MAX_REQUESTS_PER_HOST)
+    for attempt in range(RETRY_ATTEMPTS + 1):
+        wait = _host_paused_until.get(host, 0.0) - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        async with semaphore:
+            response = await client.get(url, **kwargs)
+        status = response.status_code
+        if status != 429 and status < 500:
+            remaining = response.headers.get("X-RateLimit-Remaining", "")
+            if remaining.isdigit() and int(remaining) < RATE_LIMIT_LOW_WATER:
+                pause_host(host, retry_after_seconds(response, 1.0))
+            return response
+        if attempt == RETRY_ATTEMPTS:
+            break
+
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, 0.25)
+        if status == 429:
+            pause_host(host, max(delay, retry_after_seconds(response, 0.0)))
+        else:
+            await asyncio.sleep(delay)
+    return response
+
+
+# Search result pages only need their <article> cards parsed
+ARTICLES_ONLY = SoupStrainer("article")
+
+# Recipe pages only need their JSON-LD blocks parsed
+JSON_LD_ONLY = SoupStrainer("script", type="application/ld+json")
+
+# Upstream response cache: (function name, query or URL) -> (stored_at, result)
+CACHE_TTL_SECONDS = 600
+CACHE_MAX_ENTRIES = 256
+_response_cache: OrderedDict = OrderedDict()
+
+# Upstream calls currently in flight, keyed like the response cache
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+async def coalesce(key: tuple, make_call):
+    """
+    Await the in-flight call for key, starting it with make_call() if none is running.
+
+    Concurrent callers share one upstream request and its result (or exception).
+    The shared task is shielded so one caller disconnecting doesn't cancel it
+    for the others.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(make_call())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+def singleflight(func):
+    """Coalesce concurrent calls with the same arguments into one upstream call."""
+    @functools.wraps(func)
+    async def wrapper(client: httpx.AsyncClient, *args):
+        return await coalesce((func.__name__, *args), lambda: func(client, *args))
+    return wrapper
+
+
+def cached_lookup(case_insensitive: bool = False):
+    """
+    Cache a source lookup's parsed result by its query/URL argument.
+
+    Entries expire after CACHE_TTL_SECONDS and the oldest are evicted past
+    CACHE_MAX_ENTRIES. Concurrent misses for the same key share one upstream
+    call. Empty results are not cached; if the source fails or comes back
+    empty, a stale entry is served instead when one exists.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(client: httpx.AsyncClient, arg: str):
+            key = (func.__name__, arg.lower() if case_insensitive else arg)
+            entry = _response_cache.get(key)
+            now = time.monotonic()
+            if entry and now - entry[0] < CACHE_TTL_SECONDS:
+                _response_cache.move_to_end(key)
+                return entry[1]
+
+            try:
+                result = await coalesce(key, lambda: func(client, arg))
+            except Exception:
+                if entry:
+                    return entry[1]
+                raise
+
+            if not result:
+                return entry[1] if entry else result
+
+            _response_cache[key] = (now, result)
+            _response_cache.move_to_end(key)
+            while len(_response_cache) > CACHE_MAX_ENTRIES:
+                _response_cache.popitem(last=False)
+            return result
+        return wrapper
+    return decorator
+
 
 def calc_complexity_from_counts(ing_count: int, step_count: int) -> str:
     """Calculate complexity from ingredient and step counts."""
     combined = ing_count + step_count
-    if combined <= 16:
-        return "easy"
-    elif combined >= 30:
-        return "hard"
-    return "medium"
+    return COMPLEXITY_BY_SCORE[min(combined, HARD_SCORE)]
 
 
 def filter_by_complexity(recipes: List[Dict], max_complexity: str) -> List[Dict]:
-    """Filter recipes by maximum complexity."""
+    """Filter recipes by maximum complexity (cards carry a precomputed complexity_level)."""
     if not max_complexity or max_complexity == "hard":
         return recipes
     max_level = COMPLEXITY_ORDER.get(max_complexity, 3)
-    return [r for r in recipes if COMPLEXITY_ORDER.get(r.get("complexity", "medium"), 2) <= max_level]
+    return [r for r in recipes if r["complexity_level"] <= max_level]
+
+
+# The discover page has a constant context, so it is rendered once and reused
+_discover_home_html: Optional[str] = None
 
 
 @router.get("", response_class=HTMLResponse)
 async def discover_home(request: Request):
     """Recipe discovery page."""
-    return templates.TemplateResponse("discover/index.html", {
-        "request": request,
-        "recipes": [],
-        "message": "Click 'Surprise Me!' or search to discover new recipes!",
-    })
+    global _discover_home_html
+    if _discover_home_html is None:
+        _discover_home_html = templates.get_template("discover/index.html").render({
+            "request": request,
+            "recipes": [],
+            "message": "Click 'Surprise Me!' or search to discover new recipes!",
+        })
+    return HTMLResponse(_discover_home_html, headers={"Cache-Control": DISCOVER_HOME_CACHE_CONTROL})
 
 
 @router.get("/search", response_class=HTMLResponse)
@@ -68,81 +270,99 @@ async def search_recipes(
     search_term = q.strip() if q else ""
 
     try:
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-            if search_term:
-                # Search all sources in parallel
-                results = await asyncio.gather(
-                    search_mealdb(client, search_term),
-                    search_bbc(client, search_term),
-                    search_skinnytaste(client, search_term),
-                    search_heygrillhey(client, search_term),
-                    return_exceptions=True
-                )
-
-                # Collect valid results
-                all_lists = [r for r in results if isinstance(r, list)]
-
-                # Interleave results from all sources
-                max_len = max((len(lst) for lst in all_lists), default=0)
-                for i in range(max_len):
-                    for lst in all_lists:
-                        if i < len(lst):
-                            recipes.append(lst[i])
-
-                # Apply complexity filter
-                recipes = filter_by_complexity(recipes, max_complexity)[:12]
-            else:
-                # Random: only MealDB supports random
-                meals = []
-                for _ in range(12):
-                    response = await client.get(f"{MEALDB_BASE}/random.php")
-                    if response.status_code == 200:
-                        data = response.json()
-                        if data.get("meals"):
-                            meals.extend(data["meals"])
-
-                # Filter out Indian cuisine and format
-                filtered = [m for m in meals if m.get("strArea") != "Indian"]
-                recipes = [format_mealdb_card(meal) for meal in filtered]
-                recipes = filter_by_complexity(recipes, max_complexity)[:6]
+        client = await get_http_client()
+        if search_term:
+            # Search all sources in parallel
+            results = await asyncio.gather(
+                search_mealdb(client, search_term),
+                search_bbc(client, search_term),
+                search_skinnytaste(client, search_term),
+                search_heygrillhey(client, search_term),
+                return_exceptions=True
+            )
+
+            # Collect valid results
+            all_lists = [r for r in results if isinstance(r, list)]
+
+            # Interleave results from all sources
+            recipes = [r for r in chain.from_iterable(zip_longest(*all_lists)) if r is not None]
+
+            # Apply complexity filter
+            recipes = filter_by_complexity(recipes, max_complexity)[:12]
+        else:
+            # Random: only MealDB supports random
+            meals = await fetch_random_meals(client)
+
+            # Filter out excluded cuisines and format
+            filtered = [m for m in meals if m.get("strArea") not in EXCLUDED_AREAS]
+            recipes = [format_mealdb_card(meal) for meal in filtered]
+            recipes = filter_by_complexity(recipes, max_complexity)[:6]
 
     except Exception as e:
         error_message = f"Could not fetch recipes: {str(e)}"
 
-    return templates.TemplateResponse("discover/partials/recipe_cards.html", {
+    response = templates.TemplateResponse("discover/partials/recipe_cards.html", {
         "request": request,
         "recipes": recipes,
         "search_term": search_term or "random picks",
         "error_message": error_message,
     })
+    # Search results are stable for a while; random picks and failures are not
+    if search_term and recipes and not error_message:
+        response.headers["Cache-Control"] = DISCOVER_RESULT_CACHE_CONTROL
+    return response
 
 
 # ============ TheMealDB Functions ============
 
+@cached_lookup(case_insensitive=True)
 async def search_mealdb(client: httpx.AsyncClient, query: str) -> List[Dict]:
     """Search TheMealDB for recipes."""
     recipes = []
     try:
-        response = await client.get(
+        response = await get_with_retry(
+            client,
             f"{MEALDB_BASE}/search.php",
             params={"s": query},
         )
         if response.status_code == 200:
-            data = response.json()
+            data = json_loads(response.content)
             if data.get("meals"):
-                filtered = [m for m in data["meals"] if m.get("strArea") != "Indian"]
+                filtered = [m for m in data["meals"] if m.get("strArea") not in EXCLUDED_AREAS]
                 recipes = [format_mealdb_card(meal) for meal in filtered]
     except Exception:
         pass
     return recipes
 
 
+@singleflight
+async def fetch_random_meals(client: httpx.AsyncClient) -> List[Dict]:
+    """
+    Fetch a batch of random meals from TheMealDB; failed requests are skipped.
+
+    Simultaneous "Surprise Me" clicks share the batch that is already in
+    flight rather than each firing RANDOM_FETCH_COUNT requests of their own.
+    """
+    meals = []
+    responses = await asyncio.gather(
+        *(get_with_retry(client, f"{MEALDB_BASE}/random.php") for _ in range(RANDOM_FETCH_COUNT)),
+        return_exceptions=True
+    )
+    for response in responses:
+        if isinstance(response, httpx.Response) and response.status_code == 200:
+            data = json_loads(response.content)
+            if data.get("meals"):
+                meals.extend(data["meals"])
+    return meals
+
+
 def format_mealdb_card(meal: dict) -> dict:
     """Format a MealDB meal for display as a card."""
-    ing_count = sum(1 for i in range(1, 21) if (meal.get(f"strIngredient{i}") or "").strip())
+    ing_count = sum(1 for key in MEALDB_INGREDIENT_KEYS if (meal.get(key) or "").strip())
     instructions = meal.get("strInstructions", "") or ""
-    steps = re.split(r'(?:\r?\n)+|(?<=\.)\s+(?=[A-Z0-9])', instructions)
+    steps = STEP_SPLIT_RE.split(instructions)
     steps = [s.strip() for s in steps if s.strip() and len(s.strip()) > 10]
+    complexity = calc_complexity_from_counts(ing_count, len(steps))
 
     return {
         "id": meal.get("idMeal", ""),
@@ -151,26 +371,26 @@ def format_mealdb_card(meal: dict) -> dict:
         "description": meal.get("strCategory", "") + (" - " + meal.get("strArea", "") if meal.get("strArea") else ""),
         "source": "TheMealDB",
         "source_type": "mealdb",
-        "complexity": calc_complexity_from_counts(ing_count, len(steps)),
+        "complexity": complexity,
+        "complexity_level": COMPLEXITY_ORDER[complexity],
     }
 
 
+@cached_lookup()
 async def fetch_mealdb_recipe(client: httpx.AsyncClient, recipe_id: str) -> Optional[dict]:
     """Fetch full recipe from TheMealDB."""
-    response = await client.get(f"{MEALDB_BASE}/lookup.php", params={"i": recipe_id})
+    response = await get_with_retry(client, f"{MEALDB_BASE}/lookup.php", params={"i": recipe_id})
     if response.status_code == 200:
-        data = response.json()
+        data = json_loads(response.content)
         if data.get("meals"):
             meal = data["meals"][0]
             ingredients = []
-            for i in range(1, 21):
-                ingredient = meal.get(f"strIngredient{i}", "")
-                measure = meal.get(f"strMeasure{i}", "")
-                if ingredient and ingredient.strip():
-                    if measure and measure.strip():
-                        ingredients.append(f"{measure.strip()} {ingredient.strip()}")
-                    else:
-                        ingredients.append(ingredient.strip())
+            for ing_key, measure_key in zip(MEALDB_INGREDIENT_KEYS, MEALDB_MEASURE_KEYS):
+                ingredient = (meal.get(ing_key) or "").strip()
+                if not ingredient:
+                    continue
+                measure = (meal.get(measure_key) or "").strip()
+                ingredients.append(f"{measure} {ingredient}" if measure else ingredient)
             return {
                 "name": meal.get("strMeal", ""),
                 "description": f"{meal.get('strCategory', '')} - {meal.get('strArea', '')} cuisine",
@@ -183,13 +403,14 @@ async def fetch_mealdb_recipe(client: httpx.AsyncClient, recipe_id: str) -> Opti
 
 # ============ BBC Good Food Functions ============
 
+@cached_lookup(case_insensitive=True)
 async def search_bbc(client: httpx.AsyncClient, query: str) -> List[Dict]:
     """Search BBC Good Food for recipes."""
     recipes = []
     try:
-        response = await client.get(f"{BBC_BASE}/search", params={"q": query}, headers=HTTP_HEADERS)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
+        response = await get_with_retry(client, f"{BBC_BASE}/search", params={"q": query}, headers=HTTP_HEADERS)
+        if response.status_code == 200 and "<article" in response.text:
+            soup = BeautifulSoup(response.text, "lxml", parse_only=ARTICLES_ONLY)
             cards = soup.select("article.card")[:6]
             for card in cards:
                 link = card.select_one("a.link")
@@ -209,20 +430,30 @@ async def search_bbc(client: httpx.AsyncClient, query: str) -> List[Dict]:
                         "source": "BBC Good Food",
                         "source_type": "bbc",
                         "complexity": "medium",
+                        "complexity_level": COMPLEXITY_ORDER["medium"],
                     })
     except Exception:
         pass
     return recipes
 
 
+@cached_lookup()
 async def fetch_bbc_recipe(client: httpx.AsyncClient, url: str) -> Optional[dict]:
     """Fetch full recipe from BBC Good Food using JSON-LD."""
-    response = await client.get(url, headers=HTTP_HEADERS)
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "html.parser")
+    response = await get_with_retry(client, url, headers=HTTP_HEADERS)
+    # Pages without a Recipe block anywhere aren't worth decoding or parsing
+    if response.status_code == 200 and b'"Recipe"' in response.content:
+        soup = BeautifulSoup(
+            response.content, "lxml", parse_only=JSON_LD_ONLY,
+            from_encoding=response.charset_encoding,
+        )
         for script in soup.find_all("script", type="application/ld+json"):
             try:
-                data = json.loads(script.string)
+                text = str(script.string or "")
+                # Skip Organization/BreadcrumbList/etc. blobs without parsing them
+                if '"Recipe"' not in text:
+                    continue
+                data = json_loads(text)
                 if isinstance(data, dict) and data.get("@type") == "Recipe":
                     instructions = data.get("recipeInstructions", [])
                     if isinstance(instructions, list):
@@ -246,13 +477,14 @@ async def fetch_bbc_recipe(client: httpx.AsyncClient, url: str) -> Optional[dict
 
 # ============ Skinnytaste Functions (Air Fryer) ============
 
+@cached_lookup(case_insensitive=True)
 async def search_skinnytaste(client: httpx.AsyncClient, query: str) -> List[Dict]:
     """Search Skinnytaste for recipes (great for air fryer)."""
     recipes = []
     try:
-        response = await client.get(f"{SKINNYTASTE_BASE}/", params={"s": query}, headers=HTTP_HEADERS)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
+        response = await get_with_retry(client, f"{SKINNYTASTE_BASE}/", params={"s": query}, headers=HTTP_HEADERS)
+        if response.status_code == 200 and "<article" in response.text:
+            soup = BeautifulSoup(response.text, "lxml", parse_only=ARTICLES_ONLY)
             articles = soup.select("article")[:6]
             for article in articles:
                 title_link = article.select_one("h2 a, .entry-title a")
@@ -269,6 +501,7 @@ async def search_skinnytaste(client: httpx.AsyncClient, query: str) -> List[Dict
                             "source": "Skinnytaste",
                             "source_type": "skinnytaste",
                             "complexity": "medium",
+                            "complexity_level": COMPLEXITY_ORDER["medium"],
                         })
     except Exception:
         pass
@@ -282,13 +515,14 @@ async def fetch_skinnytaste_recipe(client: httpx.AsyncClient, url: str) -> Optio
 
 # ============ Hey Grill Hey Functions (BBQ) ============
 
+@cached_lookup(case_insensitive=True)
 async def search_heygrillhey(client: httpx.AsyncClient, query: str) -> List[Dict]:
     """Search Hey Grill Hey for BBQ recipes."""
     recipes = []
     try:
-        response = await client.get(f"{HEYGRILLHEY_BASE}/", params={"s": query}, headers=HTTP_HEADERS)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
+        response = await get_with_retry(client, f"{HEYGRILLHEY_BASE}/", params={"s": query}, headers=HTTP_HEADERS)
+        if response.status_code == 200 and "<article" in response.text:
+            soup = BeautifulSoup(response.text, "lxml", parse_only=ARTICLES_ONLY)
             articles = soup.select("article")[:6]
             for article in articles:
                 title_link = article.select_one("h2 a, .entry-title a")
@@ -305,6 +539,7 @@ async def search_heygrillhey(client: httpx.AsyncClient, query: str) -> List[Dict
                             "source": "Hey Grill Hey",
                             "source_type": "heygrillhey",
                             "complexity": "medium",
+                            "complexity_level": COMPLEXITY_ORDER["medium"],
                         })
     except Exception:
         pass
@@ -318,14 +553,23 @@ async def fetch_heygrillhey_recipe(client: httpx.AsyncClient, url: str) -> Optio
 
 # ============ Shared WordPress Recipe Fetcher ============
 
+@cached_lookup()
 async def fetch_wordpress_recipe(client: httpx.AsyncClient, url: str) -> Optional[dict]:
     """Fetch recipe from WordPress sites using JSON-LD (works for most recipe blogs)."""
-    response = await client.get(url, headers=HTTP_HEADERS)
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "html.parser")
+    response = await get_with_retry(client, url, headers=HTTP_HEADERS)
+    # Pages without a Recipe block anywhere aren't worth decoding or parsing
+    if response.status_code == 200 and b'"Recipe"' in response.content:
+        soup = BeautifulSoup(
+            response.content, "lxml", parse_only=JSON_LD_ONLY,
+            from_encoding=response.charset_encoding,
+        )
         for script in soup.find_all("script", type="application/ld+json"):
             try:
-                data = json.loads(script.string)
+                text = str(script.string or "")
+                # Skip Organization/BreadcrumbList/etc. blobs without parsing them
+                if '"Recipe"' not in text:
+                    continue
+                data = json_loads(text)
 
                 # Handle @graph structure (common in WordPress)
                 if "@graph" in data:
@@ -371,23 +615,26 @@ async def fetch_recipe_details(
     error_message = None
 
     try:
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-            if source == "bbc":
-                recipe_data = await fetch_bbc_recipe(client, id)
-            elif source == "skinnytaste":
-                recipe_data = await fetch_skinnytaste_recipe(client, id)
-            elif source == "heygrillhey":
-                recipe_data = await fetch_heygrillhey_recipe(client, id)
-            else:
-                recipe_data = await fetch_mealdb_recipe(client, id)
+        client = await get_http_client()
+        if source == "bbc":
+            recipe_data = await fetch_bbc_recipe(client, id)
+        elif source == "skinnytaste":
+            recipe_data = await fetch_skinnytaste_recipe(client, id)
+        elif source == "heygrillhey":
+            recipe_data = await fetch_heygrillhey_recipe(client, id)
+        else:
+            recipe_data = await fetch_mealdb_recipe(client, id)
     except Exception as e:
         error_message = f"Could not fetch recipe: {str(e)}"
 
-    return templates.TemplateResponse("discover/partials/recipe_preview.html", {
+    response = templates.TemplateResponse("discover/partials/recipe_preview.html", {
         "request": request,
         "recipe": recipe_data,
         "error_message": error_message,
     })
+    if recipe_data and not error_message:
+        response.headers["Cache-Control"] = DISCOVER_RESULT_CACHE_CONTROL
+    return response
 
 
 @router.post("/add-recipe")
@@ -398,21 +645,19 @@ async def add_discovered_recipe(
     ingredients: str = Form(""),
     instructions: str = Form(""),
     source_url: str = Form(""),
-    db: aiosqlite.Connection = Depends(get_db),
 ):
     """Add a discovered recipe to the user's collection."""
-    ingredient_lines = [l.strip() for l in ingredients.strip().split("\n") if l.strip()]
-    complexity = calculate_complexity(len(ingredient_lines), instructions)
+    from .recipes import parse_ingredients_text, save_ingredients
 
-    cursor = await db.execute(
-        "INSERT INTO recipes (name, description, instructions, source_url, complexity) VALUES (?, ?, ?, ?, ?)",
-        (name, description, instructions, source_url or None, complexity)
-    )
-    recipe_id = cursor.lastrowid
+    ingredient_rows, _ = parse_ingredients_text(ingredients)
+    complexity = calculate_complexity(len(ingredient_rows), instructions)
 
-    from .recipes import save_ingredients
-    await save_ingredients(db, recipe_id, ingredients)
-
-    await db.commit()
+    async with transaction() as db:
+        cursor = await db.execute(
+            "INSERT INTO recipes (name, description, instructions, source_url, complexity) VALUES (?, ?, ?, ?, ?)",
+            (name, description, instructions, source_url or None, complexity)
+        )
+        recipe_id = cursor.lastrowid
+        await save_ingredients(db, recipe_id, ingredient_rows)
 
     return RedirectResponse(f"/recipes/{recipe_id}", status_code=303)
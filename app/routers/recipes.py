@@ -1,45 +1,65 @@
 from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 import aiosqlite
 from typing import Optional, List, Dict, Tuple
-import re
 
-from ..database import get_db
+from ..templating import templates, not_modified, with_etag
+from ..database import get_db, transaction, data_etag
 from ..models import Recipe, Ingredient, calculate_complexity
 from ..unit_converter import check_unsupported_units
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
-templates = Jinja2Templates(directory="app/templates")
+
+# Words accepted as a unit when they lead the text after the quantity
+UNIT_WORDS = frozenset({
+    'cup', 'cups', 'c', 'tablespoon', 'tablespoons', 'tbsp', 'teaspoon', 'teaspoons', 'tsp',
+    'ounce', 'ounces', 'oz', 'pound', 'pounds', 'lb', 'lbs', 'gram', 'grams', 'g',
+    'kilogram', 'kilograms', 'kg', 'milliliter', 'milliliters', 'ml', 'liter', 'liters', 'l',
+    'pint', 'pints', 'pt', 'quart', 'quarts', 'qt', 'gallon', 'gallons', 'gal',
+    'stick', 'sticks', 'clove', 'cloves', 'slice', 'slices', 'piece', 'pieces', 'can', 'cans',
+    'bunch', 'bunchs', 'bunche', 'bunches', 'head', 'heads', 'stalk', 'stalks',
+    'sprig', 'sprigs', 'leave', 'leaves', 'pinch', 'pinches', 'dash', 'dashes',
+    'large', 'medium', 'small',
+})
 
 
 @router.get("", response_class=HTMLResponse)
 async def list_recipes(request: Request, db: aiosqlite.Connection = Depends(get_db)):
     """List all recipes."""
+    etag = data_etag()
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     cursor = await db.execute(
         "SELECT id, name, description, complexity, favorite FROM recipes ORDER BY name"
     )
     recipes = await cursor.fetchall()
 
-    return templates.TemplateResponse("recipes/list.html", {
+    return with_etag(templates.TemplateResponse("recipes/list.html", {
         "request": request,
         "recipes": recipes,
-    })
+    }), etag)
 
 
 @router.get("/favorites", response_class=HTMLResponse)
 async def list_favorites(request: Request, db: aiosqlite.Connection = Depends(get_db)):
     """List favorite recipes."""
+    etag = data_etag()
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     cursor = await db.execute(
         "SELECT id, name, description, complexity, favorite FROM recipes WHERE favorite = 1 ORDER BY name"
     )
     recipes = await cursor.fetchall()
 
-    return templates.TemplateResponse("recipes/list.html", {
+    return with_etag(templates.TemplateResponse("recipes/list.html", {
         "request": request,
         "recipes": recipes,
         "favorites_only": True,
-    })
+    }), etag)
 
 
 @router.get("/new", response_class=HTMLResponse)
@@ -51,18 +71,23 @@ async def new_recipe_form(request: Request):
     })
 
 
-def find_unsupported_units(ingredients_text: str) -> List[Dict]:
-    """Find ingredients with unsupported units. Returns list of {line, unit} dicts."""
+def parse_ingredients_text(ingredients_text: str) -> Tuple[List[Tuple], List[Dict]]:
+    """
+    Parse each non-blank ingredient line once.
+    Returns: (rows, unit_warnings) where rows are (quantity, unit, name, sort_order)
+    and unit_warnings are {line, unit} dicts for units that can't be aggregated.
+    """
+    rows = []
     warnings = []
-    lines = ingredients_text.strip().split("\n")
-    for line in lines:
+    for i, line in enumerate(ingredients_text.strip().split("\n")):
         line = line.strip()
         if not line:
             continue
         quantity, unit, name = parse_ingredient_line(line)
+        rows.append((quantity, unit, name, i))
         if unit and check_unsupported_units(unit):
             warnings.append({"line": line, "unit": unit})
-    return warnings
+    return rows, warnings
 
 
 @router.post("/new")
@@ -74,11 +99,10 @@ async def create_recipe(
     ingredients_text: str = Form(""),
     source_url: str = Form(""),
     confirm_unsupported: str = Form(""),
-    db: aiosqlite.Connection = Depends(get_db),
 ):
     """Create a new recipe."""
-    # Check for unsupported units
-    unit_warnings = find_unsupported_units(ingredients_text)
+    # Parse ingredients and check for unsupported units
+    ingredient_rows, unit_warnings = parse_ingredients_text(ingredients_text)
 
     # If warnings exist and not confirmed, show warning and return form
     if unit_warnings and not confirm_unsupported:
@@ -93,109 +117,90 @@ async def create_recipe(
             "unit_warnings": unit_warnings,
         })
 
-    # Count ingredients for complexity calculation
-    ingredient_lines = [l.strip() for l in ingredients_text.strip().split("\n") if l.strip()]
-    complexity = calculate_complexity(len(ingredient_lines), instructions)
+    complexity = calculate_complexity(len(ingredient_rows), instructions)
 
-    cursor = await db.execute(
-        "INSERT INTO recipes (name, description, instructions, source_url, complexity) VALUES (?, ?, ?, ?, ?)",
-        (name, description, instructions, source_url or None, complexity)
-    )
-    recipe_id = cursor.lastrowid
+    async with transaction() as db:
+        cursor = await db.execute(
+            "INSERT INTO recipes (name, description, instructions, source_url, complexity) VALUES (?, ?, ?, ?, ?)",
+            (name, description, instructions, source_url or None, complexity)
+        )
+        recipe_id = cursor.lastrowid
 
-    # Parse and insert ingredients
-    await save_ingredients(db, recipe_id, ingredients_text)
+        await save_ingredients(db, recipe_id, ingredient_rows)
 
-    await db.commit()
     return RedirectResponse(f"/recipes/{recipe_id}", status_code=303)
 
 
-@router.get("/{recipe_id}", response_class=HTMLResponse)
-async def view_recipe(request: Request, recipe_id: int, db: aiosqlite.Connection = Depends(get_db)):
-    """View a single recipe."""
+async def load_recipe(db: aiosqlite.Connection, recipe_id: int) -> Optional[Recipe]:
+    """Load a recipe and its ingredients with a single JOIN query."""
     cursor = await db.execute(
-        "SELECT * FROM recipes WHERE id = ?", (recipe_id,)
+        """SELECT r.id, r.name, r.description, r.instructions, r.source_url, r.complexity, r.favorite,
+                  i.id AS ingredient_id, i.name AS ingredient_name, i.quantity, i.unit, i.sort_order
+           FROM recipes r
+           LEFT JOIN ingredients i ON i.recipe_id = r.id
+           WHERE r.id = ?
+           ORDER BY i.sort_order""",
+        (recipe_id,)
     )
-    recipe_row = await cursor.fetchone()
-    if not recipe_row:
-        return templates.TemplateResponse("error.html", {
-            "request": request,
-            "message": "Recipe not found",
-        }, status_code=404)
+    rows = await cursor.fetchall()
+    if not rows:
+        return None
 
+    # Columns are selected in a fixed order, so unpack by position
+    rid, name, description, instructions, source_url, complexity, favorite = rows[0][:7]
     recipe = Recipe(
-        id=recipe_row["id"],
-        name=recipe_row["name"],
-        description=recipe_row["description"],
-        instructions=recipe_row["instructions"],
-        source_url=recipe_row["source_url"],
-        complexity=recipe_row["complexity"] if "complexity" in recipe_row.keys() else "medium",
-    )
-    # Get favorite status (handle column not existing)
-    favorite = recipe_row["favorite"] if "favorite" in recipe_row.keys() else 0
-
-    cursor = await db.execute(
-        "SELECT * FROM ingredients WHERE recipe_id = ? ORDER BY sort_order",
-        (recipe_id,)
+        id=rid,
+        name=name,
+        description=description,
+        instructions=instructions,
+        source_url=source_url,
+        complexity=complexity,
+        favorite=bool(favorite),
     )
-    ingredient_rows = await cursor.fetchall()
+    # A recipe without ingredients comes back as one row of NULL ingredient columns
     recipe.ingredients = [
         Ingredient(
-            id=row["id"],
-            recipe_id=row["recipe_id"],
-            name=row["name"],
-            quantity=row["quantity"],
-            unit=row["unit"],
-            sort_order=row["sort_order"],
+            id=ingredient_id,
+            recipe_id=recipe_id,
+            name=ingredient_name,
+            quantity=quantity,
+            unit=unit,
+            sort_order=sort_order,
         )
-        for row in ingredient_rows
+        for ingredient_id, ingredient_name, quantity, unit, sort_order in (row[7:] for row in rows)
+        if ingredient_id is not None
     ]
+    return recipe
+
+
+def recipe_not_found(request: Request):
+    """Render the 404 page for a missing recipe."""
+    return templates.TemplateResponse("error.html", {
+        "request": request,
+        "message": "Recipe not found",
+    }, status_code=404)
+
+
+@router.get("/{recipe_id}", response_class=HTMLResponse)
+async def view_recipe(request: Request, recipe_id: int, db: aiosqlite.Connection = Depends(get_db)):
+    """View a single recipe."""
+    recipe = await load_recipe(db, recipe_id)
+    if not recipe:
+        return recipe_not_found(request)
 
     return templates.TemplateResponse("recipes/detail.html", {
         "request": request,
         "recipe": recipe,
-        "favorite": favorite,
+        "favorite": recipe.favorite,
     })
 
 
 @router.get("/{recipe_id}/print", response_class=HTMLResponse)
 async def print_recipe(request: Request, recipe_id: int, db: aiosqlite.Connection = Depends(get_db)):
     """Print-friendly view of a recipe."""
-    cursor = await db.execute(
-        "SELECT * FROM recipes WHERE id = ?", (recipe_id,)
-    )
-    recipe_row = await cursor.fetchone()
-    if not recipe_row:
-        return templates.TemplateResponse("error.html", {
-            "request": request,
-            "message": "Recipe not found",
-        }, status_code=404)
-
-    recipe = Recipe(
-        id=recipe_row["id"],
-        name=recipe_row["name"],
-        description=recipe_row["description"],
-        instructions=recipe_row["instructions"],
-        source_url=recipe_row["source_url"],
-        complexity=recipe_row["complexity"] if "complexity" in recipe_row.keys() else "medium",
-    )
-
-    cursor = await db.execute(
-        "SELECT * FROM ingredients WHERE recipe_id = ? ORDER BY sort_order",
-        (recipe_id,)
-    )
-    ingredient_rows = await cursor.fetchall()
-    recipe.ingredients = [
-        Ingredient(
-            id=row["id"],
-            recipe_id=row["recipe_id"],
-            name=row["name"],
-            quantity=row["quantity"],
-            unit=row["unit"],
-            sort_order=row["sort_order"],
-        )
-        for row in ingredient_rows
-    ]
+    recipe = await load_recipe(db, recipe_id)
+    if not recipe:
+        return recipe_not_found(request)
 
     return templates.TemplateResponse("recipes/print.html", {
         "request": request,
@@ -206,31 +211,19 @@ async def print_recipe(request: Request, recipe_id: int, db: aiosqlite.Connectio
 @router.get("/{recipe_id}/edit", response_class=HTMLResponse)
 async def edit_recipe_form(request: Request, recipe_id: int, db: aiosqlite.Connection = Depends(get_db)):
     """Show form to edit a recipe."""
-    cursor = await db.execute(
-        "SELECT * FROM recipes WHERE id = ?", (recipe_id,)
-    )
-    recipe_row = await cursor.fetchone()
-    if not recipe_row:
-        return templates.TemplateResponse("error.html", {
-            "request": request,
-            "message": "Recipe not found",
-        }, status_code=404)
-
-    cursor = await db.execute(
-        "SELECT * FROM ingredients WHERE recipe_id = ? ORDER BY sort_order",
-        (recipe_id,)
-    )
-    ingredient_rows = await cursor.fetchall()
+    recipe = await load_recipe(db, recipe_id)
+    if not recipe:
+        return recipe_not_found(request)
 
     # Format ingredients as text for editing
     ingredients_text = "\n".join(
-        f"{row['quantity'] or ''} {row['unit'] or ''} {row['name']}".strip()
-        for row in ingredient_rows
+        f"{ing.quantity or ''} {ing.unit or ''} {ing.name}".strip()
+        for ing in recipe.ingredients
     )
 
     return templates.TemplateResponse("recipes/edit.html", {
         "request": request,
-        "recipe": dict(recipe_row),
+        "recipe": recipe,
         "ingredients_text": ingredients_text,
     })
 
@@ -245,11 +238,10 @@ async def update_recipe(
     ingredients_text: str = Form(""),
     source_url: str = Form(""),
     confirm_unsupported: str = Form(""),
-    db: aiosqlite.Connection = Depends(get_db),
 ):
     """Update an existing recipe."""
-    # Check for unsupported units
-    unit_warnings = find_unsupported_units(ingredients_text)
+    # Parse ingredients and check for unsupported units
+    ingredient_rows, unit_warnings = parse_ingredients_text(ingredients_text)
 
     # If warnings exist and not confirmed, show warning and return form
     if unit_warnings and not confirm_unsupported:
@@ -265,64 +257,55 @@ async def update_recipe(
         })
 
     # Recalculate complexity
-    ingredient_lines = [l.strip() for l in ingredients_text.strip().split("\n") if l.strip()]
-    complexity = calculate_complexity(len(ingredient_lines), instructions)
-
-    await db.execute(
-        """UPDATE recipes
-           SET name = ?, description = ?, instructions = ?, source_url = ?, complexity = ?, updated_at = CURRENT_TIMESTAMP
-           WHERE id = ?""",
-        (name, description, instructions, source_url or None, complexity, recipe_id)
-    )
+    complexity = calculate_complexity(len(ingredient_rows), instructions)
 
-    # Delete existing ingredients and re-insert
-    await db.execute("DELETE FROM ingredients WHERE recipe_id = ?", (recipe_id,))
-    await save_ingredients(db, recipe_id, ingredients_text)
+    async with transaction() as db:
+        await db.execute(
+            """UPDATE recipes
+               SET name = ?, description = ?, instructions = ?, source_url = ?, complexity = ?, updated_at = CURRENT_TIMESTAMP
+               WHERE id = ?""",
+            (name, description, instructions, source_url or None, complexity, recipe_id)
+        )
+
+        # Delete existing ingredients and re-insert
+        await db.execute("DELETE FROM ingredients WHERE recipe_id = ?", (recipe_id,))
+        await save_ingredients(db, recipe_id, ingredient_rows)
 
-    await db.commit()
     return RedirectResponse(f"/recipes/{recipe_id}", status_code=303)
 
 
 @router.post("/{recipe_id}/delete")
-async def delete_recipe(recipe_id: int, db: aiosqlite.Connection = Depends(get_db)):
+async def delete_recipe(recipe_id: int):
     """Delete a recipe."""
-    await db.execute("DELETE FROM recipes WHERE id = ?", (recipe_id,))
-    await db.commit()
+    async with transaction() as db:
+        await db.execute("DELETE FROM recipes WHERE id = ?", (recipe_id,))
     return RedirectResponse("/recipes", status_code=303)
 
 
 @router.post("/{recipe_id}/favorite")
-async def toggle_favorite(request: Request, recipe_id: int, db: aiosqlite.Connection = Depends(get_db)):
+async def toggle_favorite(request: Request, recipe_id: int):
     """Toggle favorite status for a recipe."""
-    # Get current favorite status
-    cursor = await db.execute("SELECT favorite FROM recipes WHERE id = ?", (recipe_id,))
-    row = await cursor.fetchone()
-    if not row:
+    # Flip the flag in one statement; no row back means the recipe doesn't exist
+    async with transaction() as db:
+        cursor = await db.execute(
+            "UPDATE recipes SET favorite = CASE WHEN favorite THEN 0 ELSE 1 END WHERE id = ? RETURNING favorite",
+            (recipe_id,)
+        )
+        rows = await cursor.fetchall()
+    if not rows:
         return RedirectResponse("/recipes", status_code=303)
 
-    # Toggle the value
-    new_value = 0 if row["favorite"] else 1
-    await db.execute("UPDATE recipes SET favorite = ? WHERE id = ?", (new_value, recipe_id))
-    await db.commit()
-
     # Return to the referring page or recipe detail
     referer = request.headers.get("referer", f"/recipes/{recipe_id}")
     return RedirectResponse(referer, status_code=303)
 
 
-async def save_ingredients(db: aiosqlite.Connection, recipe_id: int, ingredients_text: str):
-    """Parse ingredients text and save to database."""
-    lines = ingredients_text.strip().split("\n")
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line:
-            continue
-
-        quantity, unit, name = parse_ingredient_line(line)
-
-        await db.execute(
+async def save_ingredients(db: aiosqlite.Connection, recipe_id: int, ingredient_rows: List[Tuple]):
+    """Save rows from parse_ingredients_text to the database (caller commits)."""
+    if ingredient_rows:
+        await db.executemany(
             "INSERT INTO ingredients (recipe_id, name, quantity, unit, sort_order) VALUES (?, ?, ?, ?, ?)",
-            (recipe_id, name, quantity, unit, i)
+            [(recipe_id, name, quantity, unit, sort_order) for quantity, unit, name, sort_order in ingredient_rows]
         )
 
 
@@ -333,46 +316,75 @@ def parse_ingredient_line(line: str) -> Tuple[Optional[float], Optional[str], st
     """
     line = line.strip()
 
-    # Pattern to match quantity (including fractions and decimals)
-    # Order matters: try decimals first, then fractions, then whole numbers
-    qty_pattern = r'^(\d+\.\d+|\d+\s+\d+/\d+|\d+/\d+|\d+)\s*'
-
-    # Common units
-    units = [
-        'cups?', 'c', 'tablespoons?', 'tbsp', 'teaspoons?', 'tsp',
-        'ounces?', 'oz', 'pounds?', 'lbs?', 'lb', 'grams?', 'g',
-        'kilograms?', 'kg', 'milliliters?', 'ml', 'liters?', 'l',
-        'pints?', 'pt', 'quarts?', 'qt', 'gallons?', 'gal',
-        'sticks?', 'cloves?', 'slices?', 'pieces?', 'cans?',
-        'bunche?s?', 'heads?', 'stalks?', 'sprigs?', 'leaves?',
-        'pinch(?:es)?', 'dash(?:es)?', 'large', 'medium', 'small',
-    ]
-    unit_pattern = r'(' + '|'.join(units) + r')\s+'
-
     quantity = None
     unit = None
-    name = line
 
     # Try to extract quantity
-    qty_match = re.match(qty_pattern, line, re.IGNORECASE)
-    if qty_match:
-        qty_str = qty_match.group(1)
-        quantity = parse_quantity(qty_str)
-        line = line[qty_match.end():].strip()
-
-    # Try to extract unit
-    unit_match = re.match(unit_pattern, line, re.IGNORECASE)
-    if unit_match:
-        unit = unit_match.group(1).lower()
+    qty_end = scan_quantity(line)
+    if qty_end:
+        quantity = parse_quantity(line[:qty_end])
+        line = line[qty_end:].strip()
+
+    # Try to extract unit (only when a name follows it)
+    parts = line.split(None, 1)
+    if len(parts) == 2 and parts[0].lower() in UNIT_WORDS:
         # Normalize common units
-        unit = normalize_parsed_unit(unit)
-        name = line[unit_match.end():].strip()
+        unit = normalize_parsed_unit(parts[0])
+        name = parts[1].strip()
     else:
         name = line
 
     return quantity, unit, name
 
 
+def digits_end(text: str, start: int) -> int:
+    """Return the index just past the run of digits beginning at start."""
+    end = start
+    while end < len(text) and text[end].isdecimal():
+        end += 1
+    return end
+
+
+def scan_quantity(line: str) -> int:
+    """
+    Return the length of the leading quantity in line, or 0 if there is none.
+
+    Accepts decimals ("1.5"), mixed fractions ("1 1/2"), fractions ("1/2")
+    and whole numbers, tried in that order.
+    """
+    whole_end = digits_end(line, 0)
+    if not whole_end:
+        return 0
+
+    # Decimal: 1.5
+    if line[whole_end:whole_end + 1] == '.':
+        end = digits_end(line, whole_end + 1)
+        if end > whole_end + 1:
+            return end
+
+    # Mixed fraction: 1 1/2
+    gap_end = whole_end
+    while gap_end < len(line) and line[gap_end].isspace():
+        gap_end += 1
+    if gap_end > whole_end:
+        end = scan_fraction(line, gap_end)
+        if end:
+            return end
+
+    # Fraction (1/2) or whole number (2)
+    return scan_fraction(line, 0) or whole_end
+
+
+def scan_fraction(text: str, start: int) -> int:
+    """Return the end index of a digits/digits fraction at start, or 0 if there is none."""
+    slash = digits_end(text, start)
+    if slash > start and text[slash:slash + 1] == '/':
+        end = digits_end(text, slash + 1)
+        if end > slash + 1:
+            return end
+    return 0
+
+
 def parse_quantity(qty_str: str) -> float:
     """Parse a quantity string like '2', '1/2', or '1 1/2'."""
     qty_str = qty_str.strip()
@@ -1,32 +1,41 @@
 from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 import aiosqlite
 from typing import Optional, List, Dict, Tuple
-from collections import defaultdict
 
-from ..database import get_db
+from ..templating import templates, not_modified, with_etag
+from ..database import get_db, data_version, data_etag
 from ..models import Recipe, Ingredient, ShoppingItem
 from ..unit_converter import (
     convert_to_base, suggest_shopping_unit, normalize_ingredient_name
 )
 
 router = APIRouter(prefix="/shopping", tags=["shopping"])
-templates = Jinja2Templates(directory="app/templates")
+
+# Aggregated ingredients keyed by the sorted selected recipe IDs, valid for
+# the data version in _aggregation_cache_version
+AGGREGATION_CACHE_MAX_ENTRIES = 64
+_aggregation_cache: Dict[Tuple[int, ...], List[ShoppingItem]] = {}
+_aggregation_cache_version = -1
 
 
 @router.get("", response_class=HTMLResponse)
 async def shopping_home(request: Request, db: aiosqlite.Connection = Depends(get_db)):
     """Shopping list home - select recipes."""
+    etag = data_etag()
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     cursor = await db.execute(
         "SELECT id, name, description FROM recipes ORDER BY name"
     )
     recipes = await cursor.fetchall()
 
-    return templates.TemplateResponse("shopping/select.html", {
+    return with_etag(templates.TemplateResponse("shopping/select.html", {
         "request": request,
         "recipes": recipes,
-    })
+    }), etag)
 
 
 @router.post("/inventory", response_class=HTMLResponse)
@@ -36,7 +45,7 @@ async def inventory_check(
 ):
     """Show aggregated ingredients and collect on-hand amounts."""
     form_data = await request.form()
-    recipe_ids = [int(v) for k, v in form_data.multi_items() if k == "recipe_ids"]
+    recipe_ids = [int(v) for v in form_data.getlist("recipe_ids")]
 
     if not recipe_ids:
         return templates.TemplateResponse("shopping/inventory.html", {
@@ -63,8 +72,14 @@ async def generate_shopping_list(
     """Generate the final shopping list based on inventory."""
     form_data = await request.form()
 
-    # Get recipe IDs from form (passed as hidden fields)
-    recipe_ids = [int(v) for k, v in form_data.multi_items() if k == "recipe_ids"]
+    # One pass over the form for recipe IDs (hidden fields) and on-hand amounts
+    recipe_ids = []
+    on_hand_by_name = {}
+    for key, value in form_data.multi_items():
+        if key == "recipe_ids":
+            recipe_ids.append(int(value))
+        elif key.startswith("onhand_"):
+            on_hand_by_name[key[len("onhand_"):]] = value
 
     if not recipe_ids:
         return templates.TemplateResponse("shopping/list.html", {
@@ -78,8 +93,7 @@ async def generate_shopping_list(
     shopping_list = []
     for item in aggregated:
         # Get on-hand amount from form (entered in shopping units)
-        on_hand_key = f"onhand_{item.name}"
-        on_hand_str = form_data.get(on_hand_key, "0")
+        on_hand_str = on_hand_by_name.get(item.name, "0")
         try:
             on_hand = float(on_hand_str) if on_hand_str else 0
         except ValueError:
@@ -105,56 +119,71 @@ async def generate_shopping_list(
 
 
 async def get_aggregated_ingredients(db: aiosqlite.Connection, recipe_ids: List[int]) -> List[ShoppingItem]:
-    """Get aggregated ingredients from selected recipes."""
+    """Get aggregated ingredients from selected recipes (cached per selection)."""
+    global _aggregation_cache_version
     if not recipe_ids:
         return []
 
-    # Get all ingredients from selected recipes
+    # A write since the cache was filled may have changed any of the entries
+    version = data_version()
+    if version != _aggregation_cache_version:
+        _aggregation_cache.clear()
+        _aggregation_cache_version = version
+
+    cache_key = tuple(sorted(set(recipe_ids)))
+    cached = _aggregation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Let SQLite sum repeated (name, unit) pairs across the selected recipes;
+    # a missing or zero quantity counts as 1. Groups come back in order of their
+    # first line (recipe_id, then sort_order) so the first-seen display name and
+    # base unit below are stable.
     placeholders = ",".join("?" * len(recipe_ids))
     cursor = await db.execute(
-        f"SELECT * FROM ingredients WHERE recipe_id IN ({placeholders})",
+        f"""SELECT name, unit, SUM(COALESCE(NULLIF(quantity, 0), 1)) AS quantity
+            FROM ingredients
+            WHERE recipe_id IN ({placeholders})
+            GROUP BY name, unit
+            ORDER BY MIN((recipe_id << 32) + sort_order)""",
         recipe_ids
     )
     ingredients = await cursor.fetchall()
 
-    # Aggregate by normalized name and base unit
-    aggregated: Dict[str, dict] = defaultdict(lambda: {
-        "total_base": 0,
-        "base_unit": None,
-        "unit_type": None,
-    })
+    # Aggregate by normalized name and unit type into
+    # [total_base, base_unit, display_name]; the first line seen sets the unit and name
+    aggregated: Dict[Tuple[str, str], list] = {}
 
-    for ing in ingredients:
-        name = ing["name"]
+    for name, unit, quantity in ingredients:
         normalized = normalize_ingredient_name(name)
-        quantity = ing["quantity"] or 1
-        unit = ing["unit"] or ""
+        unit = unit or ""
 
         base_qty, base_unit, unit_type = convert_to_base(quantity, unit, name)
 
         key = (normalized, unit_type)
-        agg = aggregated[key]
-
-        # If first time seeing this ingredient
-        if agg["base_unit"] is None:
-            agg["base_unit"] = base_unit
-            agg["unit_type"] = unit_type
-            agg["original_name"] = name  # Keep a display name
-
-        agg["total_base"] += base_qty
+        entry = aggregated.get(key)
+        if entry is None:
+            aggregated[key] = [base_qty, base_unit, name]
+        else:
+            entry[0] += base_qty
 
     # Convert to ShoppingItem list
     result = []
-    for (normalized, unit_type), data in sorted(aggregated.items()):
-        shop_qty, shop_unit = suggest_shopping_unit(
-            data["total_base"], data["base_unit"], data["original_name"]
-        )
+    for _, (total_base, base_unit, display_name) in sorted(aggregated.items()):
+        shop_qty, shop_unit = suggest_shopping_unit(total_base, base_unit, display_name)
         result.append(ShoppingItem(
-            name=data["original_name"],
-            total_quantity=data["total_base"],
-            base_unit=data["base_unit"],
+            name=display_name,
+            total_quantity=total_base,
+            base_unit=base_unit,
             shopping_quantity=shop_qty,
             shopping_unit=shop_unit,
         ))
 
+    # Don't cache a result that a write finishing mid-read may already have overtaken
+    if data_version() != version:
+        return result
+
+    if len(_aggregation_cache) >= AGGREGATION_CACHE_MAX_ENTRIES:
+        _aggregation_cache.clear()
+    _aggregation_cache[cache_key] = result
     return result
@@ -0,0 +1,57 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+import hashlib
+
+from fastapi import Request, Response
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+STATIC_DIR = Path(__file__).parent / "static"
+
+# Shared by all routers: compiled templates are kept in memory (no per-request
+# mtime checks) and their bytecode is cached on disk across restarts
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=True,
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=False,
+    cache_size=400,
+))
+
+
+@lru_cache(maxsize=None)
+def static_digest(path: str) -> str:
+    """Content hash of a file under app/static, used as its ?v= fingerprint."""
+    return hashlib.sha256((STATIC_DIR / path).read_bytes()).hexdigest()[:12]
+
+
+def static_url(path: str) -> str:
+    """URL for a file under app/static, fingerprinted by content so it can be cached for good."""
+    return f"/static/{path}?v={static_digest(path)}"
+
+
+templates.env.globals["static_url"] = static_url
+
+# Pages built only from the database: the browser may keep a copy but must
+# revalidate it (by ETag) before every use
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the browser's copy matches etag, else None."""
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={
+            "ETag": etag,
+            "Cache-Control": REVALIDATE_CACHE_CONTROL,
+        })
+    return None
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Tag a rendered page so the browser can revalidate it with If-None-Match."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+    return response
@@ -1,6 +1,8 @@
 """Unit conversion utilities for aggregating and converting ingredients."""
 
-from typing import Optional, Tuple, Set
+from functools import lru_cache
+from math import ceil
+from typing import Optional, Tuple, FrozenSet
 import re
 
 # Base unit conversion table (everything converts to a base unit)
@@ -69,7 +71,10 @@ COUNT_UNITS_SINGULAR = {
 }
 
 # Set of all count units for quick lookup
-COUNT_UNITS = set(COUNT_UNITS_SINGULAR.keys())
+COUNT_UNITS = frozenset(COUNT_UNITS_SINGULAR)
+
+# The singular forms that count quantities are aggregated under
+COUNT_BASE_UNITS = frozenset(COUNT_UNITS_SINGULAR.values())
 
 # Ingredient-specific conversions
 INGREDIENT_CONVERSIONS = {
@@ -84,26 +89,57 @@ INGREDIENT_CONVERSIONS = {
     },
 }
 
+# Plain unit -> (base_unit, factor, unit_type); volume beats weight beats count.
+# Count units keep their specific base unit (slice, clove, etc.)
+UNIT_TABLE = {
+    **{unit: (singular, 1, "count") for unit, singular in COUNT_UNITS_SINGULAR.items()},
+    **{unit: ("oz", factor, "weight") for unit, factor in WEIGHT_TO_OZ.items()},
+    **{unit: ("tsp", factor, "volume") for unit, factor in VOLUME_TO_TSP.items()},
+}
+
+# Units whose meaning depends on the ingredient ("stick" of butter, "large" egg)
+INGREDIENT_SPECIFIC_UNITS = frozenset(
+    unit for conversions in INGREDIENT_CONVERSIONS.values() for unit in conversions
+)
+
+# Every unit the converter understands, including ingredient-specific ones
+SUPPORTED_UNITS = frozenset(UNIT_TABLE) | INGREDIENT_SPECIFIC_UNITS
 
+# Descriptors stripped from ingredient names so "fresh basil" matches "basil"
+DESCRIPTOR_WORDS = (
+    'fresh', 'dried', 'ground', 'chopped', 'minced', 'diced', 'sliced',
+    'large', 'medium', 'small', 'whole', 'crushed', 'grated', 'shredded',
+    'melted', 'softened', 'room temperature', 'cold', 'warm', 'hot',
+    'organic', 'all-purpose', 'all purpose', 'unsalted', 'salted',
+)
+
+# One pass over the name for all descriptors instead of one re.sub per word
+DESCRIPTOR_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, DESCRIPTOR_WORDS)) + r')\b')
+PARENTHETICAL_RE = re.compile(r'\([^)]*\)')
+
+
+@lru_cache(maxsize=256)
 def normalize_unit(unit: str) -> str:
-    """Normalize unit string."""
+    """Normalize unit string (memoized; the unit vocabulary is small)."""
     if not unit:
         return ""
     return unit.lower().strip().rstrip(".")
 
 
+@lru_cache(maxsize=2048)
 def get_base_unit_and_factor(unit: str, ingredient_name: str = "") -> Tuple[str, float, str]:
     """
     Get the base unit and conversion factor for a given unit.
     Returns: (base_unit, factor, unit_type) where unit_type is 'volume', 'weight', or 'count'
+    Memoized, since the same (unit, ingredient) pairs recur across recipes.
     """
     unit = normalize_unit(unit)
-    ingredient_lower = ingredient_name.lower()
 
     # Check ingredient-specific conversions first
-    for ingredient_key, conversions in INGREDIENT_CONVERSIONS.items():
-        if ingredient_key in ingredient_lower:
-            if unit in conversions:
+    if unit in INGREDIENT_SPECIFIC_UNITS:
+        ingredient_lower = ingredient_name.lower()
+        for ingredient_key, conversions in INGREDIENT_CONVERSIONS.items():
+            if ingredient_key in ingredient_lower and unit in conversions:
                 base_unit, factor = conversions[unit]
                 # Recurse to get the actual base unit
                 if base_unit in VOLUME_TO_TSP:
@@ -113,21 +149,10 @@ def get_base_unit_and_factor(unit: str, ingredient_name: str = "") -> Tuple[str,
                 else:
                     return base_unit, factor, "count"
 
-    # Check volume units
-    if unit in VOLUME_TO_TSP:
-        return "tsp", VOLUME_TO_TSP[unit], "volume"
-
-    # Check weight units
-    if unit in WEIGHT_TO_OZ:
-        return "oz", WEIGHT_TO_OZ[unit], "weight"
-
-    # Count units - preserve the specific unit type (slice, clove, etc.)
-    if unit in COUNT_UNITS:
-        return COUNT_UNITS_SINGULAR[unit], 1, "count"
-
-    # Empty unit
-    if not unit:
-        return "unit", 1, "count"
+    # Volume, weight and count units (including the empty unit) in one lookup
+    known = UNIT_TABLE.get(unit)
+    if known:
+        return known
 
     # Unknown unit, treat as count but preserve the unit name
     return unit, 1, "count"
@@ -272,57 +297,40 @@ def suggest_shopping_unit(quantity_in_base: float, base_unit: str, ingredient_na
             return to_fraction_string(quantity_in_base), "oz"
 
     # Count units: round up to whole numbers, preserve specific unit names
-    import math
-    count = math.ceil(quantity_in_base)
+    count = ceil(quantity_in_base)
 
     # Generic "unit" becomes "count", but specific units (slice, clove, etc.) stay as-is
     if base_unit == "unit":
         return str(count), "count"
-    elif base_unit in COUNT_UNITS_SINGULAR.values():
+    elif base_unit in COUNT_BASE_UNITS:
         return str(count), base_unit
 
     return to_fraction_string(quantity_in_base), base_unit
 
 
-def get_supported_units() -> Set[str]:
+def get_supported_units() -> FrozenSet[str]:
     """Return all supported units for conversion."""
-    supported = set()
-    supported.update(VOLUME_TO_TSP.keys())
-    supported.update(WEIGHT_TO_OZ.keys())
-    supported.update(COUNT_UNITS)
-    # Add ingredient-specific units
-    for conversions in INGREDIENT_CONVERSIONS.values():
-        supported.update(conversions.keys())
-    return supported
+    return SUPPORTED_UNITS
 
 
 def check_unsupported_units(unit: str) -> bool:
     """Check if a unit is unsupported for aggregation. Returns True if unsupported."""
     if not unit:
         return False
-    unit = normalize_unit(unit)
-    supported = get_supported_units()
-    return unit not in supported
+    return normalize_unit(unit) not in SUPPORTED_UNITS
 
 
+@lru_cache(maxsize=2048)
 def normalize_ingredient_name(name: str) -> str:
-    """Normalize ingredient name for matching."""
+    """Normalize ingredient name for matching (memoized)."""
     # Remove common modifiers
     name = name.lower().strip()
 
     # Remove preparation instructions in parentheses
-    name = re.sub(r'\([^)]*\)', '', name)
+    name = PARENTHETICAL_RE.sub('', name)
 
     # Remove common descriptors
-    remove_words = [
-        'fresh', 'dried', 'ground', 'chopped', 'minced', 'diced', 'sliced',
-        'large', 'medium', 'small', 'whole', 'crushed', 'grated', 'shredded',
-        'melted', 'softened', 'room temperature', 'cold', 'warm', 'hot',
-        'organic', 'all-purpose', 'all purpose', 'unsalted', 'salted',
-    ]
-
-    for word in remove_words:
-        name = re.sub(rf'\b{word}\b', '', name)
+    name = DESCRIPTOR_RE.sub('', name)
 
     # Clean up whitespace
     name = ' '.join(name.split())
@@ -1,20 +1,26 @@
 import os
 import uvicorn
 from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
+from fastapi.datastructures import QueryParams
 from contextlib import asynccontextmanager
+from typing import Optional
 
-from app.database import init_db
+from app.templating import templates, static_digest
+from app.database import init_db, get_connection, close_db
 from app.routers import recipes, shopping, discover
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database on startup and close shared connections on shutdown."""
     await init_db()
+    await get_connection()
     yield
+    await discover.close_http_client()
+    await close_db()
 
 
 app = FastAPI(
@@ -23,35 +29,80 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Pre-encoded so each response just extends its raw header list
+NO_CACHE_HEADERS = [
+    (b"cache-control", b"no-store, no-cache, must-revalidate, max-age=0"),
+    (b"pragma", b"no-cache"),
+    (b"expires", b"0"),
+]
 
-@app.middleware("http")
-async def add_no_cache_headers(request: Request, call_next):
-    """Add Cache-Control headers to prevent browser caching."""
-    response = await call_next(request)
-    # Don't cache HTML pages or API responses (but allow static files to cache)
-    if not request.url.path.startswith("/static"):
-        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-    return response
+
+class NoCacheMiddleware:
+    """
+    Add Cache-Control headers to prevent browser caching.
+
+    Plain ASGI rather than @app.middleware("http"), so static file requests
+    pass straight through without a wrapped request/response round trip.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Don't cache HTML pages or API responses (but allow static files to cache)
+        if scope["type"] != "http" or scope["path"].startswith("/static"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_no_cache(message):
+            # Leave alone routes that set their own Cache-Control
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                if not any(name.lower() == b"cache-control" for name, _ in headers):
+                    message["headers"] = [*headers, *NO_CACHE_HEADERS]
+            await send(message)
+
+        await self.app(scope, receive, send_with_no_cache)
+
+
+# Compress HTML/HTMX responses; tiny bodies (redirects, 304s) aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=512)
+app.add_middleware(NoCacheMiddleware)
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """Static files, cached for a year when requested through a static_url() link."""
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        # Only a ?v= matching the file's current content hash is safe to keep for good
+        if response.status_code == 200:
+            version = QueryParams(scope["query_string"]).get("v")
+            if version is not None and version == static_digest(path):
+                response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
 
 
 # Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", FingerprintedStaticFiles(directory="app/static"), name="static")
 
 # Include routers
 app.include_router(recipes.router)
 app.include_router(shopping.router)
 app.include_router(discover.router)
 
-# Templates
-templates = Jinja2Templates(directory="app/templates")
+
+# The home page has no per-request data, so it is rendered once and reused
+_home_html: Optional[str] = None
 
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Home page."""
-    return templates.TemplateResponse("index.html", {"request": request})
+    global _home_html
+    if _home_html is None:
+        _home_html = templates.get_template("index.html").render({"request": request})
+    return HTMLResponse(_home_html)
 
 
 if __name__ == "__main__":
@@ -61,4 +112,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=port,
         reload=True,
+        # Templates and static_url() hashes are computed once per process, so
+        # restart on template and stylesheet edits too
+        reload_includes=["*.html", "*.css"],
     )